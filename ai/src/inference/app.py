@@ -6,15 +6,37 @@ FastAPI Inference Application
 Example inference endpoint for SageMaker or local testing
 """
 
+import asyncio
+import os
+
 import joblib
 import numpy as np
+import onnxruntime as ort
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 
-app = FastAPI(title="SageMaker Inference API", version="1.0")
+# orjson serializes the float-heavy probability payloads far faster than the
+# stdlib encoder
+app = FastAPI(title="SageMaker Inference API", version="1.0", default_response_class=ORJSONResponse)
+
+MODEL_DIR = "/opt/ml/model"
 
-# Load model at startup
+# Load model at startup; the ONNX session is preferred when an exported
+# model.onnx exists, since its C++ tree-ensemble kernel avoids sklearn's
+# Python-level tree walk.
 model = None
+ort_session = None
+
+# Reusable FP32 batch buffer, sized at startup from the model's feature count
+# so the hot path copies rows into place instead of allocating per request.
+_batch_buf = None
+_n_features = None
+
+# Micro-batching: concurrent requests are coalesced into one predict call,
+# since RandomForest per-call overhead dominates at batch size 1.
+MAX_BATCH_SIZE = 64
+MAX_WAIT_MS = 5
 
 
 class PredictionRequest(BaseModel):
@@ -28,22 +50,104 @@ class PredictionResponse(BaseModel):
     probability: list[float] = Field(..., description="Class probabilities")
 
 
+def _predict_batch(batch: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Run one inference pass over a batch, returning labels and probabilities."""
+    if ort_session is not None:
+        labels, probabilities = ort_session.run(None, {"input": batch.astype(np.float32)})
+        return labels, probabilities
+
+    # predict() is just argmax over predict_proba() for classifiers, so one
+    # traversal yields both; contiguous FP32 input avoids a silent upcast copy
+    probabilities = model.predict_proba(np.ascontiguousarray(batch, dtype=np.float32))
+    labels = np.argmax(probabilities, axis=1)
+    return labels, probabilities
+
+
+async def _batch_worker(queue: asyncio.Queue) -> None:
+    """Drain queued requests and run the model once per coalesced batch."""
+    loop = asyncio.get_running_loop()
+
+    while True:
+        future, features = await queue.get()
+        futures = [future]
+        rows = [features]
+
+        # Collect more requests until the batch is full or the window closes
+        deadline = loop.time() + MAX_WAIT_MS / 1000
+        while len(rows) < MAX_BATCH_SIZE:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                future, features = await asyncio.wait_for(queue.get(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+            futures.append(future)
+            rows.append(features)
+
+        # Assemble and predict inside the try: a malformed row must fail its
+        # own futures, not escape the loop and kill the worker task
+        try:
+            if _batch_buf is not None:
+                batch = _batch_buf[:len(rows)]
+                for i, row in enumerate(rows):
+                    np.copyto(batch[i], row, casting="unsafe")
+            else:
+                batch = np.stack(rows)
+
+            predictions, probabilities = _predict_batch(batch)
+        except Exception as e:
+            for fut in futures:
+                if not fut.done():
+                    fut.set_exception(e)
+            continue
+
+        for i, fut in enumerate(futures):
+            if not fut.done():
+                fut.set_result((int(predictions[i]), probabilities[i].tolist()))
+
+
 @app.on_event("startup")
 async def load_model() -> None:
     """Load model at startup."""
-    global model
+    global model, ort_session, _batch_buf, _n_features
+    onnx_path = os.path.join(MODEL_DIR, "model.onnx")
     try:
-        model = joblib.load("/opt/ml/model/model.joblib")
-        print("Model loaded successfully")
+        if os.path.exists(onnx_path):
+            sess_options = ort.SessionOptions()
+            sess_options.intra_op_num_threads = os.cpu_count()
+            ort_session = ort.InferenceSession(
+                onnx_path,
+                sess_options,
+                providers=["CPUExecutionProvider"]
+            )
+            print("ONNX model loaded successfully")
+        else:
+            model = joblib.load(os.path.join(MODEL_DIR, "model.joblib"))
+            print("Model loaded successfully")
     except Exception as e:
         print(f"Warning: Could not load model: {e}")
         print("Using dummy model for testing")
 
+    if ort_session is not None:
+        n_features = ort_session.get_inputs()[0].shape[1]
+    elif model is not None:
+        n_features = model.n_features_in_
+    else:
+        n_features = None
+
+    if n_features is not None:
+        _n_features = n_features
+        _batch_buf = np.empty((MAX_BATCH_SIZE, n_features), dtype=np.float32)
+
+    app.state.queue = asyncio.Queue()
+    app.state.batch_task = asyncio.create_task(_batch_worker(app.state.queue))
+
 
 @app.get("/ping")
 async def health_check() -> dict[str, str]:
     """Health check endpoint."""
-    if model is None:
+    if model is None and ort_session is None:
         raise HTTPException(status_code=503, detail="Model not loaded")
     return {"status": "healthy"}
 
@@ -51,24 +155,30 @@ async def health_check() -> dict[str, str]:
 @app.post("/invocations", response_model=PredictionResponse)
 async def predict(request: PredictionRequest) -> PredictionResponse:
     """Make predictions."""
-    if model is None:
+    if model is None and ort_session is None:
         raise HTTPException(status_code=503, detail="Model not loaded")
     
-    try:
-        # Convert to numpy array and reshape
-        features = np.array(request.features).reshape(1, -1)
-        
-        # Predict
-        prediction = int(model.predict(features)[0])
-        probabilities = model.predict_proba(features)[0].tolist()
-        
-        return PredictionResponse(
-            prediction=prediction,
-            probability=probabilities
+    features = np.asarray(request.features, dtype=np.float32)
+
+    # Reject wrong-width rows up front: pydantic checks the element type but
+    # not the length, and a bad row must not reach the shared batch
+    if _n_features is not None and features.shape != (_n_features,):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Expected {_n_features} features, got {features.shape[0] if features.ndim == 1 else features.shape}"
         )
+
+    # Hand the request to the batch worker and wait for its slice of the result
+    future: asyncio.Future = asyncio.get_running_loop().create_future()
+    await app.state.queue.put((future, features))
+
+    try:
+        prediction, probabilities = await future
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Prediction error: {str(e)}")
 
+    return {"prediction": prediction, "probability": probabilities}
+
 
 @app.get("/")
 async def root() -> dict[str, str]:
@@ -7,7 +7,11 @@ Shows how to use LangChain with Amazon Bedrock for prompt chaining, retrieval, e
 """
 
 
+import functools
 import os
+
+import boto3
+from botocore.config import Config
 from langchain_aws import ChatBedrock, BedrockEmbeddings
 from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_core.prompts import ChatPromptTemplate
@@ -17,13 +21,44 @@ from langchain_core.output_parsers import StrOutputParser
 os.environ.setdefault("AWS_REGION", "us-east-1")
 
 
+@functools.lru_cache(maxsize=8)
+def _bedrock_runtime_client(region: str) -> object:
+    """One bedrock-runtime client per region, shared by every example.
+
+    Passing this to ChatBedrock/BedrockEmbeddings via client= skips the
+    boto3 Session each constructor would otherwise build, and keep-alive
+    avoids a fresh TLS handshake per call.
+    """
+    return boto3.client(
+        "bedrock-runtime",
+        config=Config(
+            region_name=region,
+            retries={"max_attempts": 3, "mode": "adaptive"},
+            tcp_keepalive=True,
+            max_pool_connections=50
+        )
+    )
+
+
+@functools.lru_cache(maxsize=8)
+def _chat(model_id: str, temperature: float, max_tokens: int, region: str) -> ChatBedrock:
+    """One ChatBedrock per (model, params, region), reused across chains.
+
+    Construction is the expensive part — handing over the shared runtime
+    client means no per-instance boto3 Session either.
+    """
+    return ChatBedrock(
+        model_id=model_id,
+        region_name=region,
+        client=_bedrock_runtime_client(region),
+        model_kwargs={"temperature": temperature, "max_tokens": max_tokens}
+    )
+
+
 def simple_chat_example() -> None:
     """Simple chat completion with Claude via LangChain."""
-    llm = ChatBedrock(
-        model_id="anthropic.claude-3-sonnet-20240229-v1:0",
-        region_name=os.getenv("AWS_REGION", "us-east-1"),
-        model_kwargs={"temperature": 0.7, "max_tokens": 512}
-    )
+    region = os.getenv("AWS_REGION", "us-east-1")
+    llm = _chat("anthropic.claude-3-sonnet-20240229-v1:0", temperature=0.7, max_tokens=512, region=region)
     
     messages = [
         SystemMessage(content="You are a helpful AWS Solutions Architect."),
@@ -37,11 +72,8 @@ def simple_chat_example() -> None:
 
 def chain_example() -> None:
     """Use LangChain LCEL (LangChain Expression Language) for chaining."""
-    llm = ChatBedrock(
-        model_id="anthropic.claude-3-sonnet-20240229-v1:0",
-        region_name=os.getenv("AWS_REGION", "us-east-1"),
-        model_kwargs={"temperature": 0.5, "max_tokens": 256}
-    )
+    region = os.getenv("AWS_REGION", "us-east-1")
+    llm = _chat("anthropic.claude-3-sonnet-20240229-v1:0", temperature=0.5, max_tokens=256, region=region)
     
     prompt = ChatPromptTemplate.from_messages([
         ("system", "You are an expert at explaining cloud computing concepts concisely."),
@@ -60,11 +92,13 @@ def chain_example() -> None:
 
 def embeddings_example() -> None:
     """Generate embeddings with LangChain and Bedrock."""
+    region = os.getenv("AWS_REGION", "us-east-1")
     embeddings = BedrockEmbeddings(
         model_id="amazon.titan-embed-text-v2:0",
-        region_name=os.getenv("AWS_REGION", "us-east-1")
+        region_name=region,
+        client=_bedrock_runtime_client(region)
     )
-    
+
     texts = [
         "Amazon S3 is object storage built to store and retrieve any amount of data.",
         "Amazon RDS makes it easy to set up, operate, and scale a relational database.",
@@ -83,32 +117,53 @@ def embeddings_example() -> None:
 
 def retrieval_qa_example() -> None:
     """Simple retrieval example using embeddings (in-memory)."""
+    import faiss
+    import numpy as np
     from langchain_core.documents import Document
-    from langchain_community.vectorstores import FAISS
-    
+
     # Sample documents
     docs = [
         Document(page_content="Amazon Bedrock is a fully managed service for foundation models.", metadata={"source": "bedrock"}),
         Document(page_content="Amazon SageMaker helps build, train, and deploy ML models at scale.", metadata={"source": "sagemaker"}),
         Document(page_content="AWS Lambda is a serverless compute service.", metadata={"source": "lambda"}),
     ]
-    
-    # Create embeddings and vector store
+
+    # Create embeddings
+    region = os.getenv("AWS_REGION", "us-east-1")
     embeddings = BedrockEmbeddings(
         model_id="amazon.titan-embed-text-v2:0",
-        region_name=os.getenv("AWS_REGION", "us-east-1")
+        region_name=region,
+        client=_bedrock_runtime_client(region)
     )
-    
-    vectorstore = FAISS.from_documents(docs, embeddings)
-    
+
+    # Index directly with FAISS: inner product over L2-normalized vectors is
+    # cosine similarity, one SIMD dot product per candidate, and batched
+    # queries stay a single index.search call
+    vectors = np.asarray(embeddings.embed_documents([doc.page_content for doc in docs]), dtype=np.float32)
+    faiss.normalize_L2(vectors)
+
+    # int8 scalar quantization: search is memory-bound, so storing codes
+    # instead of FP32 cuts bytes moved per query 4x with near-identical top-k
+    index = faiss.IndexScalarQuantizer(
+        vectors.shape[1],
+        faiss.ScalarQuantizer.QT_8bit,
+        faiss.METRIC_INNER_PRODUCT
+    )
+    index.train(vectors)
+    index.add(vectors)
+
     # Query
     query = "What service helps with foundation models?"
-    results = vectorstore.similarity_search(query, k=1)
-    
+    query_vector = np.asarray([embeddings.embed_query(query)], dtype=np.float32)
+    faiss.normalize_L2(query_vector)
+
+    _, ids = index.search(query_vector, k=1)
+    top_doc = docs[ids[0][0]]
+
     print("Retrieval Example:")
     print(f"Query: {query}")
-    print(f"Top result: {results[0].page_content}")
-    print(f"Source: {results[0].metadata['source']}\n")
+    print(f"Top result: {top_doc.page_content}")
+    print(f"Source: {top_doc.metadata['source']}\n")
 
 
 if __name__ == "__main__":
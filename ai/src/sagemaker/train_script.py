@@ -12,7 +12,7 @@ import os
 import joblib
 import numpy as np
 import pandas as pd
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble import HistGradientBoostingClassifier
 from sklearn.metrics import accuracy_score, classification_report
 from sklearn.model_selection import train_test_split
 
@@ -35,44 +35,56 @@ def parse_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
-def load_data(train_dir: str, test_dir: str) -> tuple[pd.DataFrame, pd.DataFrame]:
+def _load_split(data_dir: str, name: str) -> tuple[np.ndarray, np.ndarray]:
+    """Load one data split, preferring a memory-mapped .npy over CSV parsing."""
+    npy_file = os.path.join(data_dir, f"{name}.npy")
+    if os.path.exists(npy_file):
+        # mmap pages rows in on demand straight from the file cache, so there
+        # is no text parsing and no second in-memory copy of the dataset
+        arr = np.load(npy_file, mmap_mode="r")
+        return arr[:, :-1], arr[:, -1].astype(np.int32)
+
+    # pyarrow reads the CSVs multi-threaded and keeps columns in Arrow buffers,
+    # so the to_numpy(copy=False) views avoid a second FP64 copy
+    df = pd.read_csv(os.path.join(data_dir, f"{name}.csv"), engine="pyarrow", dtype_backend="pyarrow")
+    # Assume last column is target; FP32 halves the cache footprint during fit
+    X = df.iloc[:, :-1].to_numpy(dtype=np.float32, copy=False)
+    y = df.iloc[:, -1].to_numpy(dtype=np.int32, copy=False)
+    return X, y
+
+
+def load_data(train_dir: str, test_dir: str) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
     """Load training and test data."""
-    train_file = os.path.join(train_dir, "train.csv")
-    test_file = os.path.join(test_dir, "test.csv")
-    
-    train_df = pd.read_csv(train_file)
-    test_df = pd.read_csv(test_file)
-    
-    print(f"Train data shape: {train_df.shape}")
-    print(f"Test data shape: {test_df.shape}")
-    
-    return train_df, test_df
+    X_train, y_train = _load_split(train_dir, "train")
+    X_test, y_test = _load_split(test_dir, "test")
+
+    print(f"Train data shape: {X_train.shape}")
+    print(f"Test data shape: {X_test.shape}")
 
+    return X_train, y_train, X_test, y_test
 
-def train_model(args: argparse.Namespace) -> RandomForestClassifier:
-    """Train RandomForest model."""
+
+def train_model(args: argparse.Namespace) -> HistGradientBoostingClassifier:
+    """Train gradient boosting model."""
     print("Loading data...")
-    train_df, test_df = load_data(args.train, args.test)
-    
-    # Assume last column is target
-    X_train = train_df.iloc[:, :-1].values
-    y_train = train_df.iloc[:, -1].values
-    X_test = test_df.iloc[:, :-1].values
-    y_test = test_df.iloc[:, -1].values
-    
+    X_train, y_train, X_test, y_test = load_data(args.train, args.test)
+
     print("Training model...")
-    model = RandomForestClassifier(
-        n_estimators=args.n_estimators,
+    # Histogram-based boosting bins features into uint8 histograms, so each
+    # split is a tight SIMD reduction — much faster than per-split RF work
+    model = HistGradientBoostingClassifier(
+        max_iter=args.n_estimators,
         max_depth=args.max_depth,
         random_state=args.random_state,
-        n_jobs=-1
+        early_stopping=True
     )
     
     model.fit(X_train, y_train)
     
-    # Evaluate
-    train_preds = model.predict(X_train)
-    test_preds = model.predict(X_test)
+    # Evaluate both splits in one traversal instead of two
+    X_all = np.vstack([X_train, X_test])
+    preds_all = model.predict(X_all)
+    train_preds, test_preds = preds_all[:len(X_train)], preds_all[len(X_train):]
     
     train_acc = accuracy_score(y_train, train_preds)
     test_acc = accuracy_score(y_test, test_preds)
@@ -95,12 +107,42 @@ def train_model(args: argparse.Namespace) -> RandomForestClassifier:
     return model
 
 
-def save_model(model: RandomForestClassifier, model_dir: str) -> None:
+def save_model(model: HistGradientBoostingClassifier, model_dir: str) -> None:
     """Save trained model."""
     model_path = os.path.join(model_dir, "model.joblib")
-    joblib.dump(model, model_path)
+    # lz4 + pickle protocol 5 shrinks the artifact several-fold and dumps the
+    # model's numpy buffers out-of-band without a copy, which speeds up both
+    # the post-training S3 upload and model load at deploy time
+    try:
+        import lz4  # noqa: F401
+        joblib.dump(model, model_path, compress=("lz4", 3), protocol=5)
+    except ImportError:
+        joblib.dump(model, model_path, compress=3, protocol=5)
     print(f"Model saved to {model_path}")
 
+    export_onnx(model, model_dir)
+
+
+def export_onnx(model: HistGradientBoostingClassifier, model_dir: str) -> None:
+    """Export the model to ONNX so the endpoint can serve it with onnxruntime."""
+    try:
+        from skl2onnx import convert_sklearn
+        from skl2onnx.common.data_types import FloatTensorType
+    except ImportError:
+        print("skl2onnx not available, skipping ONNX export")
+        return
+
+    onnx_model = convert_sklearn(
+        model,
+        initial_types=[("input", FloatTensorType([None, model.n_features_in_]))],
+        options={id(model): {"zipmap": False}}
+    )
+
+    onnx_path = os.path.join(model_dir, "model.onnx")
+    with open(onnx_path, "wb") as f:
+        f.write(onnx_model.SerializeToString())
+    print(f"ONNX model saved to {onnx_path}")
+
 
 if __name__ == "__main__":
     args = parse_args()